@@ -1,117 +1,107 @@
+import hashlib
 import json
+import re
+import select
 import socket
+import struct
+import time
 import requests
-from typing import Dict, Any, List, Callable, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Callable, Iterator, Optional, Tuple
 import threading
 import queue
-import time
+from collections import deque
+from types import MappingProxyType
 from datetime import datetime, timezone
 # removed tkinter; switch to PyQt5
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
+try:
+    import orjson  # optional: faster JSON encode/decode on the request/response path
+except ImportError:
+    orjson = None
 
 # ----- Logging helpers -----
 VERBOSE_LOGS = False
 ACTIVITY_LOG_HOOK: Optional[Callable[[str], None]] = None
+# Lines kept in the UI activity log; older lines are dropped
+ACTIVITY_LOG_MAX_LINES = 5000
 
 # Global toggle: when True, actually send socket commands to robot; when False, only log
 ROBOT_SEND_ENABLED = False
 
+# Exact-match cache of model replies: an identical request (model, messages, tools, options)
+# is answered from disk instead of re-running inference
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_PATH = "response_cache.jsonl"
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+# Plans that were approved and fully executed, keyed by the normalized request plus the
+# kitchen state it started from; a repeat skips the planner round-trip (the plan is still reviewed)
+PLAN_CACHE_ENABLED = True
+PLAN_CACHE_PATH = "plan_cache.jsonl"
+
+# Conversation window: once the history exceeds HISTORY_MAX_MESSAGES or HISTORY_MAX_CHARS of
+# message text (system prompt not counted), everything but the system prompt, the current request
+# and the recent tail is folded into a summary. The tail is at most HISTORY_KEEP_RECENT messages
+# and, down to half that count, at most half the character budget. When even that tail is over the
+# budget, the character limit is raised to 1.5x the size left by the last fold, so large tool results
+# do not trigger a summary call on every step.
+HISTORY_MAX_MESSAGES = 40
+HISTORY_KEEP_RECENT = 20
+HISTORY_MAX_CHARS = 16000
+
+# How long Ollama keeps the model (and its prompt KV cache) loaded between requests
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Generation caps for the tool loop (reasoning tokens count too): answering a new user request
+# may need a plan, a follow-up after tool results is usually one more tool call or a short reply
+NUM_PREDICT_PLANNING = 2048
+NUM_PREDICT_FOLLOW_UP = 1024
+STOP_SEQUENCES = ["\n\nUser:"]
+# Streamed tokens are forwarded to the UI at most this often (seconds); tokens in between are sent together
+STREAM_FLUSH_INTERVAL = 0.016
+
+# Shared HTTP session so every Ollama call reuses a keep-alive connection. Transient overload
+# responses (model loading, busy server) and connect errors are retried with backoff on the same pooled socket;
+# once retries run out the last response is returned to the caller's own error handling.
+# Read timeouts are not retried: the request reached the model, and resending it would repeat the generation.
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json", "Connection": "keep-alive"})
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=Retry(
+    total=3,
+    read=0,
+    other=0,
+    backoff_factor=0.3,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+)))
+
+# (connect, read) timeouts for tool-loop requests: fail fast when Ollama is not running,
+# but allow long gaps between tokens while the model is thinking
+OLLAMA_TIMEOUT = (3, 60)
+
 # Canonical robot commands (strict, no paraphrasing)
-CANONICAL_COMMANDS = {
+CANONICAL_COMMANDS = frozenset({
     "Open the left cabinet door",
     "Close the left cabinet door",
     "Take off the lid from the gray recipient and place it on the counter",
     "Pick up the lid from the counter and put it on the gray recipient",
     "Pick up the green pineapple from the left cabinet and place it in the gray recipient",
     "Put salt in the gray recipient",
-}
-
-def _log_debug(message: str):
-    if VERBOSE_LOGS:
-        print(message)
-        if ACTIVITY_LOG_HOOK:
-            try:
-                ACTIVITY_LOG_HOOK(message)
-            except Exception:
-                pass
-
-def _log_info(message: str):
-    print(message)
-    if ACTIVITY_LOG_HOOK:
-        try:
-            ACTIVITY_LOG_HOOK(message)
-        except Exception:
-            pass
+})
+CANONICAL_COMMANDS_SORTED = tuple(sorted(CANONICAL_COMMANDS))
 
+# Tools whose immediate repeat with identical arguments cannot change anything; the model
+# sometimes emits the same call twice in one burst, and the repeat reuses the first result
+IDEMPOTENT_TOOLS = frozenset({"get_current_plan", "update_kitchen_state", "mark_task_complete"})
 
-def send(cmd):
-    """Function that GPT-OSS will call"""
-    global ROBOT_SEND_ENABLED
-    if ROBOT_SEND_ENABLED:
-        try:
-            s = socket.socket()
-            s.connect(("localhost", 7000))
-            s.send(json.dumps(cmd).encode("utf-8"))
-            resp = s.recv(65536).decode("utf-8")
-            s.close()
-            _log_info("[Robot] SENT command")
-            return resp
-        except Exception as e:
-            _log_info(f"[Robot] ERR send -> {e}")
-            raise
-    else:
-        _log_info(f"[Robot] DRY-RUN {cmd}")
-        return None
+# Keys the model may use for a step's text in create_plan / revised plans, in priority order
+TITLE_KEYS = ("title", "description", "command", "action", "name", "step", "instruction", "task")
 
-class GPTOSSChatBot:
-    def __init__(self,
-                 on_assistant_message: Optional[Callable[[str], None]] = None,
-                 on_tool_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
-                 on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
-                 on_plan_update: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
-                 on_execute_start: Optional[Callable[[str], None]] = None,
-                 on_assistant_stream: Optional[Callable[[Dict[str, Any]], None]] = None):
-        self.gpt_oss_url = "http://localhost:11434/api/chat"
-        self.conversation_history = []
-        self.available_functions = {
-            "execute_robot_command": self.execute_robot_command,
-            "update_kitchen_state": self.update_kitchen_state,
-            "mark_task_complete": self.mark_task_complete,
-            "get_current_plan": self.get_current_plan,
-            "create_plan": self.create_plan,
-            "review_plan": self.review_plan
-        }
-        
-        # UI callbacks
-        self.on_assistant_message = on_assistant_message
-        self.on_tool_result = on_tool_result
-        self.on_status_update = on_status_update
-        self.on_plan_update = on_plan_update
-        self.on_execute_start = on_execute_start
-        self.on_assistant_stream = on_assistant_stream
-        
-        # State tracking
-        self.last_robot_status: Optional[Dict[str, Any]] = None
-        self.current_task: Optional[str] = None
-        self.current_user_task_text: Optional[str] = None
-        self.task_list: List[Dict[str, Any]] = []  # [{"id": 1, "title": str, "done": bool}]
-        self.plan_approved: bool = False
-        # Initialize with default kitchen state
-        self.kitchen_state: Dict[str, Any] = {
-            "cabinet_open": False,
-            "lid_on_gray_recipient": True,
-            "pineapple_in_gray_recipient": False,
-            "salt_added": False
-        }
-        
-        # Initialize with system prompt that enables function calling
-        self.conversation_history = [{
-            "role": "system",
-            "content": self._get_system_prompt()
-        }]
-    
-    def _get_system_prompt(self):
-        return """You are a fully autonomous kitchen assistant. You have complete control over task planning, execution, and state management.
+# System prompt for the planning/execution model (static, built once at import)
+SYSTEM_PROMPT = """You are a fully autonomous kitchen assistant. You have complete control over task planning, execution, and state management.
 
 ## Your Capabilities
 You can execute robot actions and manage your own state using these functions:
@@ -189,6 +179,452 @@ After completing a task: mark_task_complete(task_id)
 
 You have complete autonomy. Plan, execute, and manage everything yourself!"""
 
+# Shared first message of every conversation history (never mutated, so its encoding is reused)
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Tool schema advertised to GPT-OSS on every chat step (static, built once at import)
+TOOLS_SCHEMA = (
+    {
+        "type": "function",
+        "function": {
+            "name": "execute_robot_command",
+            "description": "Execute a command on the kitchen robot",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "language_instruction": {
+                        "type": "string",
+                        "description": "Natural language instruction for the robot"
+                    },
+                    "use_angle_stop": {
+                        "type": "boolean",
+                        "description": "Whether to use angle stop (default: true)",
+                        "default": True
+                    }
+                },
+                "required": ["language_instruction"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "update_kitchen_state",
+            "description": "Update remembered kitchen state (assistant-managed)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "state_updates": {"type": "object", "description": "Partial state to merge"}
+                },
+                "required": ["state_updates"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "mark_task_complete",
+            "description": "Mark a task id as complete in current plan",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "task_id": {"type": "integer"}
+                },
+                "required": ["task_id"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_plan",
+            "description": "Get current task list and kitchen state",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_plan",
+            "description": "Create a new task plan for the user",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tasks": {
+                        "type": "array",
+                        "description": "List of tasks to create",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string", "description": "Task description"},
+                                "description": {"type": "string", "description": "Task description (alternative field)"},
+                                "command": {"type": "string", "description": "Task command (alternative field)"},
+                                "action": {"type": "string", "description": "Task action (alternative field)"}
+                            },
+                            "additionalProperties": True
+                        }
+                    }
+                },
+                "required": ["tasks"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "review_plan",
+            "description": "Validate the current plan against the kitchen_state using principle-based checks and optionally return a minimally revised plan.",
+            "parameters": {"type": "object", "properties": {"instructions": {"type": "string"}}}
+        }
+    }
+)
+
+def _json_bytes(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize to compact (or 2-space indented) UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, sort_keys=sort_keys, indent=2).encode("utf-8")
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":")).encode("utf-8")
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    return _json_bytes(obj, indent=indent).decode("utf-8")
+
+def _json_loads(data):
+    """Parse JSON from str or bytes; raises ValueError (json.JSONDecodeError) on bad input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _coerce_args(args) -> Dict[str, Any]:
+    """Tool-call arguments as a dict: Ollama sends an object, some models a JSON string"""
+    if isinstance(args, dict):
+        return args
+    return _json_loads(args) if args else {}
+
+def _burst_signature(content: str, tool_calls: List[Dict[str, Any]]) -> bytes:
+    """Short digest of an assistant step (text plus tool calls) for spotting a model stuck in a loop"""
+    data = content.encode("utf-8") + b"\0" + _json_bytes(tool_calls, sort_keys=True)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+# TOOLS_SCHEMA never changes, so its encoding is spliced into request bodies as-is
+TOOLS_SCHEMA_JSON = _json_bytes(TOOLS_SCHEMA)
+
+def _request_bytes(payload: Dict[str, Any], messages_json: bytes) -> bytes:
+    """Serialize a chat request around its already-encoded "messages" array (and TOOLS_SCHEMA)"""
+    shared_tools = payload.get("tools") is TOOLS_SCHEMA
+    head = _json_bytes({k: v for k, v in payload.items() if k != "messages" and not (shared_tools and k == "tools")})
+    body = head[:-1] + b',"messages":' + messages_json
+    if shared_tools:
+        body += b',"tools":' + TOOLS_SCHEMA_JSON
+    return body + b"}"
+
+def _response_cache_key(payload: Dict[str, Any], messages_json: Optional[bytes] = None) -> str:
+    # "stream" only changes the wire format, not the reply
+    skip = {"stream"}
+    if messages_json is not None:
+        skip.add("messages")
+    if payload.get("tools") is TOOLS_SCHEMA:
+        skip.add("tools")
+    request = {k: v for k, v in payload.items() if k not in skip}
+    digest = hashlib.sha256(_json_bytes(request, sort_keys=True))
+    if messages_json is not None:
+        digest.update(messages_json)
+    if "tools" in skip:
+        digest.update(TOOLS_SCHEMA_JSON)
+    return digest.hexdigest()
+
+def _iter_ndjson(response) -> Iterator[bytearray]:
+    """Non-empty lines of a streamed NDJSON response, split as raw bytes as soon as each line is complete"""
+    buf = bytearray()
+    # chunk_size=None hands over each network chunk as it arrives instead of waiting for a fixed size
+    for block in response.iter_content(chunk_size=None):
+        buf += block
+        start = 0
+        nl = buf.find(b"\n")
+        while nl != -1:
+            if nl > start:
+                yield buf[start:nl]
+            start = nl + 1
+            nl = buf.find(b"\n", start)
+        del buf[:start]
+    if buf.strip():
+        yield buf
+
+_HISTORY_SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_first_json(text: str) -> Any:
+    """Decode the first complete JSON object in a reply that wraps it in prose.
+    raw_decode stops at the object's closing brace, so trailing text (even text with braces) is ignored.
+    """
+    start = text.find("{")
+    while start != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except ValueError:
+            start = text.find("{", start + 1)
+    raise ValueError("No JSON in reply")
+
+# Filler words ignored when matching a request against cached plans
+_PLAN_KEY_STOPWORDS = frozenset({
+    "a", "an", "the", "me", "my", "please", "can", "could", "would", "you", "i", "to", "some", "now", "for",
+})
+
+def _task_title(task: Any) -> str:
+    """Checklist title for a plan step given as a string or as a dict (see TITLE_KEYS)"""
+    if not isinstance(task, dict):
+        return str(task)
+    title = next((task[k] for k in TITLE_KEYS if isinstance(task.get(k), (str, int, float))), None)
+    if title is None and len(task) == 1:
+        only_val = next(iter(task.values()))
+        if isinstance(only_val, (str, int, float)):
+            title = only_val
+    return str(title) if title is not None else str(task)
+
+def _plan_cache_key(user_message: str, kitchen_state: Dict[str, Any]) -> str:
+    # Word order and repeats are kept: "open then close" and "close then open" are different plans,
+    # and so are "open and close" and "open, close and open again"
+    words = [w for w in re.findall(r"[a-z]+", user_message.lower()) if w not in _PLAN_KEY_STOPWORDS]
+    state = ",".join(f"{k}={kitchen_state[k]}" for k in sorted(kitchen_state))
+    return " ".join(words) + "|" + state
+
+def _load_json_cache(path: str, max_entries: Optional[int] = None) -> Dict[str, Any]:
+    """Load an append-only JSONL cache of [key, value] records (later records win, oldest first).
+    Missing file -> empty cache; unreadable records are skipped. The file is rewritten
+    compacted when most of its records are superseded or evicted.
+    """
+    cache: Dict[str, Any] = {}
+    records = 0
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                records += 1
+                try:
+                    key, value = _json_loads(line)
+                except (ValueError, TypeError):
+                    continue
+                cache.pop(key, None)
+                cache[key] = value
+    except OSError:
+        return {}
+    if max_entries is not None:
+        while len(cache) > max_entries:
+            del cache[next(iter(cache))]
+    if records > 2 * len(cache) + 16:
+        try:
+            with open(path, "wb") as f:
+                f.writelines(_json_bytes([k, v]) + b"\n" for k, v in cache.items())
+        except OSError as e:
+            _log_info(f"[Cache] ERR compact {path} -> {e}")
+    return cache
+
+def _append_json_cache(path: str, key: str, value: Any):
+    """Persist one cache record without rewriting the file"""
+    try:
+        with open(path, "ab") as f:
+            f.write(_json_bytes([key, value]) + b"\n")
+    except OSError as e:
+        _log_info(f"[Cache] ERR save {path} -> {e}")
+
+def _log_debug(message: str):
+    if VERBOSE_LOGS:
+        print(message)
+        if ACTIVITY_LOG_HOOK:
+            try:
+                ACTIVITY_LOG_HOOK(message)
+            except Exception:
+                pass
+
+# (monotonic time, ISO string) of the last timestamp handed out, see _now_iso
+_NOW_ISO = (float("-inf"), "")
+
+def _now_iso() -> str:
+    """Current UTC time as ISO 8601; calls within 50 ms (one tool burst) share the same string"""
+    global _NOW_ISO
+    mono = time.monotonic()
+    if mono - _NOW_ISO[0] >= 0.05:
+        _NOW_ISO = (mono, datetime.now(timezone.utc).isoformat())
+    return _NOW_ISO[1]
+
+def _log_info(message: str):
+    print(message)
+    if ACTIVITY_LOG_HOOK:
+        try:
+            ACTIVITY_LOG_HOOK(message)
+        except Exception:
+            pass
+
+
+# Robot socket timeouts (seconds). A reply only arrives once the task has finished on the robot,
+# so the reply timeout must cover the longest task; it exists so a hung robot cannot wedge the loop.
+ROBOT_CONNECT_TIMEOUT = 5.0
+ROBOT_REPLY_TIMEOUT = 120.0
+
+# Robot wire protocol. False (default): the original protocol - one connection per command, raw JSON
+# sent, reply read with a single recv. True: one persistent connection, each message in both directions
+# prefixed with its 4-byte big-endian length; only for robot servers that speak this framing.
+ROBOT_FRAMED = False
+
+# Persistent robot connection (framed protocol), opened lazily and shared by all commands
+_ROBOT_SOCK: Optional[socket.socket] = None
+_ROBOT_LOCK = threading.Lock()
+
+def _robot_open() -> socket.socket:
+    sock = socket.create_connection(("localhost", 7000), timeout=ROBOT_CONNECT_TIMEOUT)
+    sock.settimeout(ROBOT_REPLY_TIMEOUT)
+    # Commands are small and sent in one write: don't let Nagle hold them back
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+def _robot_sock_usable(sock: socket.socket) -> bool:
+    """Whether an idle connection can carry the next command. Between commands nothing should be
+    readable: EOF means the robot closed it, and stray bytes would be misread as the next reply.
+    """
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return not readable
+    except (OSError, ValueError):
+        return False
+
+def _robot_connect() -> socket.socket:
+    global _ROBOT_SOCK
+    if _ROBOT_SOCK is not None and not _robot_sock_usable(_ROBOT_SOCK):
+        # A send on a socket the peer already closed still succeeds; only the reply read would fail
+        _log_info("[Robot] Connection closed by robot; reconnecting")
+        _robot_close()
+    if _ROBOT_SOCK is None:
+        _ROBOT_SOCK = _robot_open()
+    return _ROBOT_SOCK
+
+def _robot_close():
+    global _ROBOT_SOCK
+    if _ROBOT_SOCK is not None:
+        try:
+            _ROBOT_SOCK.close()
+        except OSError:
+            pass
+        _ROBOT_SOCK = None
+
+def _recv_exact(sock: socket.socket, n: int) -> bytearray:
+    """Read exactly n bytes (replies may span several TCP segments)"""
+    buf = bytearray(n)
+    view = memoryview(buf)
+    off = 0
+    while off < n:
+        got = sock.recv_into(view[off:])
+        if got == 0:
+            raise ConnectionResetError("robot closed the connection")
+        off += got
+    return buf
+
+def _robot_reply_error(resp: Optional[str]) -> Optional[str]:
+    """Return the error reported in a robot reply ({"ok": false} or {"status": "error"}), if any"""
+    if not resp:
+        return None
+    try:
+        reply = _json_loads(resp)
+    except ValueError:
+        return None
+    if isinstance(reply, dict) and (reply.get("ok") is False or reply.get("status") == "error"):
+        return str(reply.get("error") or reply.get("message") or "Robot reported an error")
+    return None
+
+def send(cmd):
+    """Function that GPT-OSS will call (wire format: see ROBOT_FRAMED)"""
+    global ROBOT_SEND_ENABLED
+    if ROBOT_SEND_ENABLED:
+        body = _json_bytes(cmd)
+        with _ROBOT_LOCK:
+            waiting = False  # True once the command is out and only the reply is pending
+            try:
+                if ROBOT_FRAMED:
+                    sock = _robot_connect()
+                    sock.sendall(struct.pack(">I", len(body)) + body)
+                    waiting = True
+                    (length,) = struct.unpack(">I", _recv_exact(sock, 4))
+                    resp = _recv_exact(sock, length).decode("utf-8")
+                else:
+                    with _robot_open() as sock:
+                        sock.sendall(body)
+                        waiting = True
+                        resp = sock.recv(65536).decode("utf-8")
+            except socket.timeout:
+                # A late reply would be read as the answer to the next command: drop the connection
+                _robot_close()
+                reason = f"no reply within {ROBOT_REPLY_TIMEOUT:.0f}s" if waiting else f"connect timed out after {ROBOT_CONNECT_TIMEOUT:.0f}s"
+                _log_info(f"[Robot] ERR send -> {reason}")
+                raise TimeoutError(f"Robot timed out: {reason}")
+            except Exception as e:
+                _robot_close()
+                _log_info(f"[Robot] ERR send -> {e}")
+                raise
+        _log_info("[Robot] SENT command")
+        return resp
+    else:
+        _log_info(f"[Robot] DRY-RUN {cmd}")
+        return None
+
+class GPTOSSChatBot:
+    def __init__(self,
+                 on_assistant_message: Optional[Callable[[str], None]] = None,
+                 on_tool_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_plan_update: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 on_execute_start: Optional[Callable[[str], None]] = None,
+                 on_assistant_stream: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.gpt_oss_url = "http://localhost:11434/api/chat"
+        self.conversation_history = []
+        # Tool dispatch table, fixed at construction
+        self.available_functions = MappingProxyType({
+            "execute_robot_command": self.execute_robot_command,
+            "update_kitchen_state": self.update_kitchen_state,
+            "mark_task_complete": self.mark_task_complete,
+            "get_current_plan": self.get_current_plan,
+            "create_plan": self.create_plan,
+            "review_plan": self.review_plan
+        })
+        
+        # UI callbacks
+        self.on_assistant_message = on_assistant_message
+        self.on_tool_result = on_tool_result
+        self.on_status_update = on_status_update
+        self.on_plan_update = on_plan_update
+        self.on_execute_start = on_execute_start
+        self.on_assistant_stream = on_assistant_stream
+        
+        # State tracking
+        self.last_robot_status: Optional[Dict[str, Any]] = None
+        self.current_task: Optional[str] = None
+        self.current_user_task_text: Optional[str] = None
+        self.task_list: List[Dict[str, Any]] = []  # [{"id": 1, "title": str, "done": bool}]
+        self._task_by_id: Dict[int, Dict[str, Any]] = {}  # same task dicts, keyed by id
+        self.plan_approved: bool = False
+        self._last_thinking_ts = 0.0  # time.monotonic() of the last "thinking" indicator
+        # Initialize with default kitchen state
+        self.kitchen_state: Dict[str, Any] = {
+            "cabinet_open": False,
+            "lid_on_gray_recipient": True,
+            "pineapple_in_gray_recipient": False,
+            "salt_added": False
+        }
+        
+        # Stored model replies and reusable plans (see RESPONSE_CACHE_* / PLAN_CACHE_*)
+        self._response_cache: Dict[str, Dict[str, Any]] = _load_json_cache(RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_ENTRIES) if RESPONSE_CACHE_ENABLED else {}
+        self._plan_cache: Dict[str, List[str]] = _load_json_cache(PLAN_CACHE_PATH) if PLAN_CACHE_ENABLED else {}
+        self._plan_cache_key: Optional[str] = None
+        # Encoded bytes of history messages, keyed by id() (see _encode_messages)
+        self._message_bytes: Dict[int, Any] = {}
+        # Message characters (system prompt excluded) left by the last history fold, see _prune_history
+        self._pruned_chars = 0
+        # Messages produced while a tool burst runs; recorded after its tool results (see _call_gpt_oss)
+        self._pending_history: List[Dict[str, Any]] = []
+        
+        # Initialize with system prompt that enables function calling
+        self.conversation_history = [SYSTEM_MESSAGE]
+
     def execute_robot_command(self, language_instruction: str, use_angle_stop: bool = True):
         """Execute a command on the robot"""
         self.current_task = language_instruction
@@ -198,8 +634,8 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
                 "status": "error",
                 "error": "Non-canonical command. Use an exact phrase from the canonical list.",
                 "instruction": language_instruction,
-                "allowed": sorted(list(CANONICAL_COMMANDS)),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "allowed": CANONICAL_COMMANDS_SORTED,
+                "timestamp": _now_iso()
             }
             if self.on_tool_result:
                 self.on_tool_result("execute_robot_command", payload)
@@ -222,12 +658,15 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
         
         try:
             result = send(cmd)
+            robot_error = _robot_reply_error(result)
+            if robot_error:
+                raise RuntimeError(robot_error)
             payload = {
                 "status": "success",
                 "result": result,
                 "instruction": language_instruction,
                 "use_angle_stop": True,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": _now_iso()
             }
             
             if self.on_tool_result:
@@ -240,7 +679,7 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
                 "error": str(e),
                 "instruction": language_instruction,
                 "use_angle_stop": True,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": _now_iso()
             }
             if self.on_tool_result:
                 self.on_tool_result("execute_robot_command", payload)
@@ -255,17 +694,19 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
             if not isinstance(state_updates, dict):
                 return {"status": "error", "error": "state_updates must be an object"}
             self.kitchen_state.update(state_updates)
+            timestamp = _now_iso()
             if self.on_status_update:
+                # The UI reads this on its own thread later: hand it a snapshot, copied once here
                 self.on_status_update({
                     "status": "success",
-                    "kitchen_state": self.kitchen_state,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
+                    "kitchen_state": dict(self.kitchen_state),
+                    "timestamp": timestamp
                 })
             _log_info(f"[State] {state_updates}")
             return {
                 "status": "success",
-                "updated_state": self.kitchen_state,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "updated_state": self.kitchen_state,  # live reference: callers must not mutate it
+                "timestamp": timestamp
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -273,17 +714,18 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
     def mark_task_complete(self, task_id: int):
         """Let GPT-OSS mark tasks as complete"""
         try:
-            for task in self.task_list:
-                if task.get("id") == task_id:
-                    task["done"] = True
-                    break
+            task = self._task_by_id.get(task_id)
+            if task is not None:
+                task["done"] = True
             if self.on_plan_update:
                 self.on_plan_update(self.task_list)
             _log_info(f"[Plan] Task #{task_id} complete")
+            if self.plan_approved and self.task_list and all(t.get("done") for t in self.task_list):
+                self._remember_plan()
             return {
                 "status": "success",
                 "updated_tasks": self.task_list,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -294,9 +736,17 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
             "status": "success",
             "current_plan": self.task_list,
             "kitchen_state": self.kitchen_state,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _now_iso()
         }
     
+    def _set_plan(self, steps: List[Any]) -> List[Dict[str, Any]]:
+        """Replace the checklist with one unfinished task per plan step (titles only) and publish it once"""
+        self.task_list = [{"id": i, "title": _task_title(step), "done": False} for i, step in enumerate(steps, 1)]
+        self._task_by_id = {t["id"]: t for t in self.task_list}
+        if self.on_plan_update:
+            self.on_plan_update(self.task_list)
+        return self.task_list
+
     def create_plan(self, tasks: List[Dict[str, Any]]):
         """Let GPT-OSS create a new task plan"""
         try:
@@ -305,53 +755,17 @@ You have complete autonomy. Plan, execute, and manage everything yourself!"""
             if not isinstance(tasks, list):
                 raise ValueError("tasks must be a list")
             
-            # Extract only task descriptions for the checklist
-            formatted_tasks = []
-            for i, task in enumerate(tasks):
-                if isinstance(task, dict):
-                    # Extract description from task object
-                    description = (
-                        task.get("title")
-                        or task.get("description")
-                        or task.get("command")
-                        or task.get("action")
-                        or task.get("name")
-                        or task.get("step")
-                        or task.get("instruction")
-                        or task.get("task")
-                    )
-                    if description is None and len(task) == 1:
-                        only_val = next(iter(task.values()))
-                        if isinstance(only_val, (str, int, float)):
-                            description = str(only_val)
-                    if description is None:
-                        description = str(task)
-                    formatted_tasks.append({
-                        "id": i + 1,
-                        "title": description,
-                        "done": False
-                    })
-                else:
-                    # If task is just a string, use it as description
-                    formatted_tasks.append({
-                        "id": i + 1,
-                        "title": str(task),
-                        "done": False
-                    })
-            
-            self.task_list = formatted_tasks
-            if self.on_plan_update:
-                self.on_plan_update(self.task_list)
+            self._set_plan(tasks)
             _log_info(f"[Plan] Created {len(self.task_list)} tasks")
             try:
-                lines = "\n".join([f"  {t.get('id')}. {t.get('title')}" for t in self.task_list])
+                lines = "\n".join(f"  {t['id']}. {t['title']}" for t in self.task_list)
                 _log_info(f"[Plan] Tasks:\n{lines}")
             except Exception:
                 pass
             return {
                 "status": "success",
                 "created_plan": self.task_list,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -410,7 +824,7 @@ The robot only understands these exact canonical commands - you cannot paraphras
             
             review_messages = [
                 {"role": "system", "content": rubric},
-                {"role": "user", "content": json.dumps(review_data)}
+                {"role": "user", "content": _json_dumps(review_data)}
             ]
             
             # Log what we're sending to the reviewer
@@ -419,35 +833,43 @@ The robot only understands these exact canonical commands - you cannot paraphras
             _log_info(f"[Review] Kitchen state: {self.kitchen_state}")
             _log_info(f"[Review] Plan being reviewed: {[task.get('title') for task in self.task_list]}")
 
-            payload = {"model": "gpt-oss:20b", "messages": review_messages, "stream": False}
-            resp = requests.post(self.gpt_oss_url, json=payload, timeout=60)
-            if resp.status_code != 200:
-                _log_info(f"[Review] HTTP {resp.status_code}")
-                return {"status": "error", "error": f"HTTP {resp.status_code}: {resp.text}"}
-            parsed = self._parse_gpt_response(resp.text)
-            message = parsed.get("message", {})
+            # Greedy decoding: the same plan and kitchen state always get the same verdict, which is what makes it cacheable
+            payload = {"model": "gpt-oss:20b", "messages": review_messages, "stream": False,
+                       "options": {"temperature": 0.0}, "keep_alive": OLLAMA_KEEP_ALIVE}
+            cache_key = _response_cache_key(payload)
+            message = self._cached_reply(cache_key)
+            fresh = message is None
+            if fresh:
+                resp = SESSION.post(self.gpt_oss_url, data=_json_bytes(payload), timeout=60)
+                if resp.status_code != 200:
+                    _log_info(f"[Review] HTTP {resp.status_code}")
+                    resp.encoding = "utf-8"  # Ollama always sends UTF-8; skip charset detection
+                    return {"status": "error", "error": f"HTTP {resp.status_code}: {resp.text}"}
+                parsed = self._parse_gpt_response(resp.content)
+                message = parsed.get("message", {})
             content = message.get("content", "").strip()
             try:
-                result = json.loads(content)
+                result = _json_loads(content)
             except Exception:
                 # If the model returned text, try to extract JSON substring
                 try:
-                    start = content.find('{')
-                    end = content.rfind('}')
-                    if start != -1 and end != -1 and end > start:
-                        result = json.loads(content[start:end+1])
-                    else:
-                        raise ValueError("No JSON in reply")
+                    result = _extract_first_json(content)
                 except Exception as e:
                     _log_info(f"[Review] Invalid reply")
                     return {"status": "error", "error": f"Invalid validator reply: {e}", "raw": content}
+            if not isinstance(result, dict) or "approved" not in result:
+                _log_info(f"[Review] Invalid reply")
+                return {"status": "error", "error": "Invalid validator reply: no verdict", "raw": content}
+            # Only a reply that parsed as a verdict is worth replaying
+            if fresh:
+                self._store_reply(cache_key, message)
 
             approved = bool(result.get("approved"))
             reasons = result.get("reasons") if isinstance(result.get("reasons"), list) else []
             revised = result.get("revised_plan") if isinstance(result.get("revised_plan"), list) else None
             
             # Log the complete review response for debugging
-            _log_info(f"[Review] Full response: {json.dumps(result, indent=2)}")
+            _log_info(f"[Review] Full response: {_json_dumps(result, indent=True)}")
             _log_info(f"[Review] Approved: {approved}")
             if reasons:
                 _log_info(f"[Review] Reasons: {reasons}")
@@ -457,34 +879,9 @@ The robot only understands these exact canonical commands - you cannot paraphras
             applied_plan = None
             if revised and not approved:
                 # Apply revised plan to UI (extract titles only)
-                formatted = []
-                for i, step in enumerate(revised):
-                    if isinstance(step, dict):
-                        title = (
-                            step.get("title")
-                            or step.get("description")
-                            or step.get("command")
-                            or step.get("action")
-                            or step.get("name")
-                            or step.get("step")
-                            or step.get("instruction")
-                            or step.get("task")
-                        )
-                        if title is None and len(step) == 1:
-                            only_val = next(iter(step.values()))
-                            if isinstance(only_val, (str, int, float)):
-                                title = str(only_val)
-                        if title is None:
-                            title = str(step)
-                    else:
-                        title = str(step)
-                    formatted.append({"id": i+1, "title": title, "done": False})
-                self.task_list = formatted
-                applied_plan = formatted
-                if self.on_plan_update:
-                    self.on_plan_update(self.task_list)
+                applied_plan = self._set_plan(revised)
                 try:
-                    lines = "\n".join([f"  {t.get('id')}. {t.get('title')}" for t in self.task_list])
+                    lines = "\n".join(f"  {t['id']}. {t['title']}" for t in self.task_list)
                     _log_info(f"[Plan] Revised Tasks:\n{lines}")
                 except Exception:
                     pass
@@ -507,33 +904,7 @@ The robot only understands these exact canonical commands - you cannot paraphras
             
             # If plan was approved, send plan message and prepare for automatic execution
             if approved and self.task_list:
-                plan_steps = [f"{i+1}. {task.get('title', '')}" for i, task in enumerate(self.task_list)]
-                plan_message = f"Here's my plan:\n" + "\n".join(plan_steps) + "\n\nI'll execute it now."
-                if self.on_assistant_message:
-                    try:
-                        self.on_assistant_message(plan_message)
-                    except Exception:
-                        pass
-                _log_info("[Plan] Sent plan message to user after approval")
-                
-                # Add the plan message to conversation history
-                self.conversation_history.append({
-                    "role": "assistant", 
-                    "content": plan_message
-                })
-                
-                # Add system message to trigger immediate execution
-                self.conversation_history.append({
-                    "role": "system",
-                    "content": "Begin executing the plan now. Call execute_robot_command for the first task."
-                })
-                
-                # Show executing indicator in chat
-                if self.on_assistant_message:
-                    try:
-                        self.on_assistant_message("🚀 Assistant is executing...")
-                    except Exception:
-                        pass
+                self._announce_approved_plan()
             
             # No chat messages during review - keep it silent for background processing
 
@@ -542,33 +913,104 @@ The robot only understands these exact canonical commands - you cannot paraphras
                 "approved": approved,
                 "reasons": reasons,
                 "applied_revision": applied_plan is not None,
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": _now_iso()
             }
             return result_payload
         except Exception as e:
             _log_info(f"[Review] ERR -> {e}")
             return {"status": "error", "error": str(e)}
     
+    def _announce_approved_plan(self):
+        """Send the approved plan to the user and queue the instruction to start executing it"""
+        plan_steps = "\n".join(f"{i+1}. {task['title']}" for i, task in enumerate(self.task_list))
+        plan_message = f"Here's my plan:\n{plan_steps}\n\nI'll execute it now."
+        if self.on_assistant_message:
+            try:
+                self.on_assistant_message(plan_message)
+            except Exception:
+                pass
+        _log_info("[Plan] Sent plan message to user after approval")
+        
+        # Add the plan message to conversation history
+        self._pending_history.append({
+            "role": "assistant", 
+            "content": plan_message
+        })
+        
+        # Add system message to trigger immediate execution
+        self._pending_history.append({
+            "role": "system",
+            "content": "Begin executing the plan now. Call execute_robot_command for the first task."
+        })
+        
+        # Show executing indicator in chat
+        if self.on_assistant_message:
+            try:
+                self.on_assistant_message("🚀 Assistant is executing...")
+            except Exception:
+                pass
+
+    def _reuse_cached_plan(self, titles: List[str]):
+        """Load a previously approved plan without asking the planner again; it still goes through review"""
+        _log_info(f"[Plan] Reusing cached plan ({len(titles)} steps)")
+        tasks = [{"title": title} for title in titles]
+        plan_payload = self.create_plan(tasks)
+        # Record it as the model's own create_plan call so execution continues from it
+        self._append_history({
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{"type": "function", "function": {"name": "create_plan", "arguments": {"tasks": tasks}}}]
+        }, {
+            "role": "tool",
+            "tool_call_id": "call_plan_cache",
+            "name": "create_plan",
+            "content": _json_dumps(plan_payload)
+        })
+        # The same words can still mean a different request, so the reviewer gets the final say;
+        # on approval review_plan announces the plan and queues execution
+        review_payload = self.review_plan()
+        if self.on_tool_result:
+            try:
+                self.on_tool_result("review_plan", review_payload)
+            except Exception:
+                pass
+        self._append_history({
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{"type": "function", "function": {"name": "review_plan", "arguments": {}}}]
+        }, {
+            "role": "tool",
+            "tool_call_id": "call_plan_cache_review",
+            "name": "review_plan",
+            "content": _json_dumps(review_payload)
+        })
+
     def chat(self, user_message: str) -> str:
         """Main chat function - handles user input and returns response"""
         
-        # Show thinking indicator in chat
-        if self.on_assistant_message:
+        # Show thinking indicator in chat (once per burst of messages sent within 200 ms)
+        now = time.monotonic()
+        if self.on_assistant_message and now - self._last_thinking_ts > 0.2:
+            self._last_thinking_ts = now
             try:
                 self.on_assistant_message("🤔 Assistant is thinking...")
             except Exception:
                 pass
         
         # Add user message to conversation
-        self.conversation_history.append({
+        self._append_history({
             "role": "user", 
             "content": user_message
         })
         self.current_task = user_message
         self.current_user_task_text = user_message
         
-        # Directly call GPT-OSS and let it decide how to proceed (tools vs. text)
-        # No pre-status calls, no injected kitchen state, no pre-planning
+        # A request already planned and completed from this same kitchen state reuses that plan;
+        # otherwise GPT-OSS decides how to proceed (tools vs. text)
+        self._plan_cache_key = _plan_cache_key(user_message, self.kitchen_state) if PLAN_CACHE_ENABLED else None
+        cached_plan = self._plan_cache.get(self._plan_cache_key) if self._plan_cache_key else None
+        if cached_plan:
+            self._reuse_cached_plan(cached_plan)
         
         # Get GPT-OSS response loop
         gpt_response = self._call_gpt_oss()
@@ -583,181 +1025,112 @@ The robot only understands these exact canonical commands - you cannot paraphras
     def _call_gpt_oss(self) -> str:
         """Call GPT-OSS API with function calling support in a loop until tasks complete"""
         
-        # Define available tools for GPT-OSS
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "execute_robot_command",
-                    "description": "Execute a command on the kitchen robot",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "language_instruction": {
-                                "type": "string",
-                                "description": "Natural language instruction for the robot"
-                            },
-                            "use_angle_stop": {
-                                "type": "boolean",
-                                "description": "Whether to use angle stop (default: true)",
-                                "default": True
-                            }
-                        },
-                        "required": ["language_instruction"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_kitchen_state",
-                    "description": "Update remembered kitchen state (assistant-managed)",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "state_updates": {"type": "object", "description": "Partial state to merge"}
-                        },
-                        "required": ["state_updates"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "mark_task_complete",
-                    "description": "Mark a task id as complete in current plan",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "task_id": {"type": "integer"}
-                        },
-                        "required": ["task_id"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_current_plan",
-                    "description": "Get current task list and kitchen state",
-                    "parameters": {"type": "object", "properties": {}}
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "create_plan",
-                    "description": "Create a new task plan for the user",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "tasks": {
-                                "type": "array",
-                                "description": "List of tasks to create",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "title": {"type": "string", "description": "Task description"},
-                                        "description": {"type": "string", "description": "Task description (alternative field)"},
-                                        "command": {"type": "string", "description": "Task command (alternative field)"},
-                                        "action": {"type": "string", "description": "Task action (alternative field)"}
-                                    },
-                                    "additionalProperties": True
-                                }
-                            }
-                        },
-                        "required": ["tasks"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "review_plan",
-                    "description": "Validate the current plan against the kitchen_state using principle-based checks and optionally return a minimally revised plan.",
-                    "parameters": {"type": "object", "properties": {"instructions": {"type": "string"}}}
-                }
-            }
-        ]
-        
         max_steps = 50
         step = 0
+        # A model stuck re-emitting the same tool burst is stopped instead of running out the step limit.
+        # One immediate repeat is normal (execute_robot_command is re-issued after the review guard skips it).
+        max_repeats = 2
+        last_burst = None
+        repeats = 0
         
         try:
             while step < max_steps:
                 step += 1
                 _log_info(f"[GPT] step {step}")
+                # Messages held back during the last tool burst go after its tool results,
+                # so each burst is answered by exactly one model call
+                if self._pending_history:
+                    self._append_history(*self._pending_history)
+                    self._pending_history = []
+                self._prune_history()
                 
                 payload = {
                     "model": "gpt-oss:20b",
                     "messages": self.conversation_history,
-                    "tools": tools,
+                    "tools": TOOLS_SCHEMA,
                     "tool_choice": "auto",
                     "stream": True,
-                    "temperature": 0.0,  # Zero temperature for maximum consistency
-                    "top_p": 0.9  # Slightly reduce randomness
+                    # Ollama reads sampling settings from "options" only
+                    "options": {
+                        "temperature": 0.0,  # Zero temperature for maximum consistency
+                        "top_p": 0.9,  # Slightly reduce randomness
+                        "num_predict": NUM_PREDICT_PLANNING if self.conversation_history[-1].get("role") == "user" else NUM_PREDICT_FOLLOW_UP,
+                        "stop": STOP_SEQUENCES
+                    },
+                    "keep_alive": OLLAMA_KEEP_ALIVE
                 }
                 
-                # Use non-streaming mode for better reliability
-                _log_info("[Request] Using non-streaming mode for stable communication")
-                payload["stream"] = False
-                response = requests.post(self.gpt_oss_url, json=payload, timeout=30)
+                # Only messages added since the last step are serialized again
+                messages_json = self._encode_messages(self.conversation_history)
+                cache_key = _response_cache_key(payload, messages_json)
+                message = self._cached_reply(cache_key)
+                streamed = message is None
+                if streamed:
+                    response = SESSION.post(self.gpt_oss_url, data=_request_bytes(payload, messages_json), timeout=OLLAMA_TIMEOUT, stream=True)
                 
-                if response.status_code != 200:
-                    error_text = response.text[:500]  # Show more error text
-                    _log_info(f"[HTTP {response.status_code}] request failed: {error_text}")
+                    if response.status_code != 200:
+                        response.encoding = "utf-8"  # Ollama always sends UTF-8; skip charset detection
+                        error_text = response.text[:500]  # Show more error text
+                        _log_info(f"[HTTP {response.status_code}] request failed: {error_text}")
                     
-                    # If it's a tool parsing error, try to continue with simpler approach
-                    if response.status_code == 500 and "parsing tool call" in error_text:
-                        _log_info("[Recovery] Tool parsing error - retrying without tools")
-                        # Try a simpler request without tools to get a text response
-                        simple_payload = {
-                            "model": "gpt-oss:20b", 
-                            "messages": self.conversation_history[-2:],  # Just recent context
-                            "stream": False,
-                            "temperature": 0.1
-                        }
-                        try:
-                            simple_resp = requests.post(self.gpt_oss_url, json=simple_payload, timeout=30)
-                            if simple_resp.status_code == 200:
-                                parsed = self._parse_gpt_response(simple_resp.text)
-                                content = parsed.get("message", {}).get("content", "")
-                                if content:
-                                    if self.on_assistant_message:
-                                        try:
-                                            self.on_assistant_message(content)
-                                        except Exception:
-                                            pass
-                                    self.conversation_history.append({"role": "assistant", "content": content})
-                                    return content
-                        except Exception as e:
-                            _log_info(f"[Recovery] Simple request also failed: {e}")
+                        # If it's a tool parsing error, try to continue with simpler approach
+                        if response.status_code == 500 and "parsing tool call" in error_text:
+                            _log_info("[Recovery] Tool parsing error - retrying without tools")
+                            # Try a simpler request without tools to get a text response
+                            simple_payload = {
+                                "model": "gpt-oss:20b", 
+                                "messages": self.conversation_history[-2:],  # Just recent context
+                                "stream": False,
+                                "options": {"temperature": 0.1, "num_predict": NUM_PREDICT_FOLLOW_UP},
+                                "keep_alive": OLLAMA_KEEP_ALIVE
+                            }
+                            try:
+                                simple_resp = SESSION.post(self.gpt_oss_url, data=_json_bytes(simple_payload), timeout=30)
+                                if simple_resp.status_code == 200:
+                                    parsed = self._parse_gpt_response(simple_resp.content)
+                                    content = parsed.get("message", {}).get("content", "")
+                                    if content:
+                                        if self.on_assistant_message:
+                                            try:
+                                                self.on_assistant_message(content)
+                                            except Exception:
+                                                pass
+                                        self._append_history({"role": "assistant", "content": content})
+                                        return content
+                            except Exception as e:
+                                _log_info(f"[Recovery] Simple request also failed: {e}")
                     
-                    if self.on_assistant_message:
-                        try:
-                            self.on_assistant_message("I'm having trouble with the model right now. Please try again.")
-                        except Exception:
-                            pass
-                    return f"HTTP Error {response.status_code}: {error_text}"
+                        if self.on_assistant_message:
+                            try:
+                                self.on_assistant_message("I'm having trouble with the model right now. Please try again.")
+                            except Exception:
+                                pass
+                        return f"HTTP Error {response.status_code}: {error_text}"
                 
-                # Parse non-streaming response
-                parsed = self._parse_gpt_response(response.text)
-                message = parsed.get("message", {})
+                    # Consume the stream; content deltas reach the UI as they arrive
+                    message, done_reason = self._read_stream(response)
+                    if done_reason is None or done_reason == "length":
+                        # Broken off or cut at num_predict: not an answer, so neither cached nor acted on
+                        _log_info(f"[Stream] Incomplete reply ({done_reason or 'no final chunk'}) -> non-streaming request")
+                        if message.get("content") and self.on_assistant_stream:
+                            # The partial text is already on screen: take it back before the retry's reply
+                            try:
+                                self.on_assistant_stream({"type": "discard"})
+                            except Exception:
+                                pass
+                        message = {}
+                    else:
+                        self._store_reply(cache_key, message)
+                else:
+                    done_reason = "stop"
                 full_content = message.get("content", "")
                 tool_calls_buffer = message.get("tool_calls", [])
                 
-                # Simulate streaming for UI consistency
-                if full_content and self.on_assistant_stream:
+                # Stored replies are delivered to the UI in one piece
+                if not streamed and full_content and self.on_assistant_stream:
                     try:
                         self.on_assistant_stream({"type": "start"})
-                        # Break content into chunks for streaming effect
-                        words = full_content.split(' ')
-                        for i in range(0, len(words), 3):  # 3 words at a time
-                            chunk = ' '.join(words[i:i+3])
-                            if i + 3 < len(words):
-                                chunk += ' '
-                            self.on_assistant_stream({"type": "delta", "text": chunk})
-                            time.sleep(0.05)  # Small delay for streaming effect
+                        self.on_assistant_stream({"type": "delta", "text": full_content})
                         self.on_assistant_stream({"type": "end"})
                     except Exception:
                         pass
@@ -765,147 +1138,47 @@ The robot only understands these exact canonical commands - you cannot paraphras
                 # If the assistant emitted tool calls, execute them
                 if tool_calls_buffer:
                     _log_info(f"[Tool] {len(tool_calls_buffer)} call(s)")
-                    tool_results = []
-                    for i, tool_call in enumerate(tool_calls_buffer):
-                        function_name = tool_call["function"]["name"]
-                        function_args = tool_call["function"].get("arguments", {})
-                        # concise argument preview for key tools
-                        preview = ""
-                        if function_name == "execute_robot_command":
-                            if isinstance(function_args, dict):
-                                preview = function_args.get("language_instruction", "")[:60]
-                        _log_info(f"  ↳ {function_name} {('('+preview+'...)') if preview else ''}")
-                        if function_name in self.available_functions:
-                            try:
-                                if isinstance(function_args, str):
-                                    try:
-                                        function_args = json.loads(function_args)
-                                    except Exception:
-                                        pass
-                                # Enforce review before executing robot steps and send plan message
-                                if function_name == "execute_robot_command" and not self.plan_approved:
-                                    _log_info("[Guard] Plan not approved yet; invoking review_plan before execution")
-                                    review_payload = self.review_plan()
-                                    if self.on_tool_result:
-                                        try:
-                                            self.on_tool_result("review_plan", review_payload)
-                                        except Exception:
-                                            pass
-                                    tool_results.append(review_payload)
-                                    # Record synthetic tool call/result in history to let model observe
-                                    self.conversation_history.append({
-                                        "role": "assistant",
-                                        "content": "",
-                                        "tool_calls": [{"type": "function", "function": {"name": "review_plan", "arguments": {}}}]
-                                    })
-                                    self.conversation_history.append({
-                                        "role": "tool",
-                                        "tool_call_id": "call_review_autoguard",
-                                        "name": "review_plan",
-                                        "content": json.dumps(review_payload)
-                                    })
-                                    _log_info("  ✓ review_plan (auto)")
-                                    
-                                    # Plan message and execution setup is now handled in review_plan function
-                                    # Continue to next iteration to process the system message for execution
-                                    continue
-                                result_payload = self.available_functions[function_name](**function_args)
-                                if self.on_tool_result:
-                                    try:
-                                        self.on_tool_result(function_name, result_payload)
-                                    except Exception:
-                                        pass
-                                tool_results.append(result_payload)
-                                _log_info(f"  ✓ {function_name}")
-                            except Exception as e:
-                                error_result = {"status": "error", "error": str(e)}
-                                tool_results.append(error_result)
-                                _log_info(f"  ✗ {function_name} -> {e}")
-                        else:
-                            unknown_result = {"status": "error", "error": f"Unknown function: {function_name}"}
-                            tool_results.append(unknown_result)
-                            _log_info(f"  ✗ Unknown function: {function_name}")
-                    # Update history with streamed assistant message and tool calls
-                    self.conversation_history.append({
-                        "role": "assistant",
-                        "content": full_content,
-                        "tool_calls": tool_calls_buffer
-                    })
-                    for i, (tool_call, result_payload) in enumerate(zip(tool_calls_buffer, tool_results)):
-                        self.conversation_history.append({
-                            "role": "tool",
-                            "tool_call_id": f"call_{i}",
-                            "name": tool_call["function"]["name"],
-                            "content": json.dumps(result_payload)
-                        })
+                    burst = _burst_signature(full_content, tool_calls_buffer)
+                    repeats = repeats + 1 if burst == last_burst else 0
+                    last_burst = burst
+                    if repeats >= max_repeats:
+                        _log_info("[GPT] Same tool calls repeated; stopping")
+                        return full_content or "I kept repeating the same step, so I stopped. Please rephrase or continue."
+                    self._dispatch_tool_calls(tool_calls_buffer, full_content)
                     # Continue loop to let model observe results
                     continue
                 else:
                     # No tool calls; finalize text answer
                     if full_content:
-                        self.conversation_history.append({
+                        self._append_history({
                             "role": "assistant",
                             "content": full_content
                         })
                         return full_content
-                    # Fallback: non-streaming request if no streamed content arrived
-                    _log_info("[Fallback] No stream content -> non-streaming request")
+                    # Fallback: non-streaming request if the stream gave no usable reply
+                    if done_reason is not None:
+                        _log_info("[Fallback] No stream content -> non-streaming request")
                     fallback_payload = dict(payload)
                     fallback_payload["stream"] = False
+                    if done_reason == "length":
+                        # The capped reply ran out of tokens: let the retry finish
+                        fallback_payload["options"] = {k: v for k, v in payload["options"].items() if k != "num_predict"}
                     try:
-                        non_stream_resp = requests.post(self.gpt_oss_url, json=fallback_payload, timeout=30)
+                        non_stream_resp = SESSION.post(self.gpt_oss_url, data=_request_bytes(fallback_payload, messages_json), timeout=OLLAMA_TIMEOUT)
                         if non_stream_resp.status_code == 200:
-                            parsed = self._parse_gpt_response(non_stream_resp.text)
+                            parsed = self._parse_gpt_response(non_stream_resp.content)
                             message = parsed.get("message", {})
                             content = message.get("content", "")
                             tool_calls = message.get("tool_calls", [])
                             if tool_calls:
                                 _log_info(f"[Tool] {len(tool_calls)} call(s) (fallback)")
-                                tool_results = []
-                                for i, tool_call in enumerate(tool_calls):
-                                    function_name = tool_call["function"]["name"]
-                                    function_args = tool_call["function"].get("arguments", {})
-                                    preview = ""
-                                    if function_name == "execute_robot_command":
-                                        if isinstance(function_args, dict):
-                                            preview = function_args.get("language_instruction", "")[:60]
-                                    _log_info(f"  ↳ {function_name} {('('+preview+'...)') if preview else ''}")
-                                    if function_name in self.available_functions:
-                                        try:
-                                            if isinstance(function_args, str):
-                                                try:
-                                                    function_args = json.loads(function_args)
-                                                except Exception:
-                                                    pass
-                                            result_payload = self.available_functions[function_name](**function_args)
-                                            if self.on_tool_result:
-                                                try:
-                                                    self.on_tool_result(function_name, result_payload)
-                                                except Exception:
-                                                    pass
-                                            tool_results.append(result_payload)
-                                            _log_info(f"  ✓ {function_name}")
-                                        except Exception as e:
-                                            error_result = {"status": "error", "error": str(e)}
-                                            tool_results.append(error_result)
-                                            _log_info(f"  ✗ {function_name} -> {e}")
-                                    else:
-                                        unknown_result = {"status": "error", "error": f"Unknown function: {function_name}"}
-                                        tool_results.append(unknown_result)
-                                        _log_info(f"  ✗ Unknown function: {function_name}")
-                                # Record and continue
-                                self.conversation_history.append({
-                                    "role": "assistant",
-                                    "content": content,
-                                    "tool_calls": tool_calls
-                                })
-                                for i, (tool_call, result_payload) in enumerate(zip(tool_calls, tool_results)):
-                                    self.conversation_history.append({
-                                        "role": "tool",
-                                        "tool_call_id": f"call_{i}",
-                                        "name": tool_call["function"]["name"],
-                                        "content": json.dumps(result_payload)
-                                    })
+                                burst = _burst_signature(content, tool_calls)
+                                repeats = repeats + 1 if burst == last_burst else 0
+                                last_burst = burst
+                                if repeats >= max_repeats:
+                                    _log_info("[GPT] Same tool calls repeated; stopping")
+                                    return content or "I kept repeating the same step, so I stopped. Please rephrase or continue."
+                                self._dispatch_tool_calls(tool_calls, content)
                                 continue
                             elif content:
                                 # Simulate streamed delivery to UI for consistency
@@ -916,7 +1189,7 @@ The robot only understands these exact canonical commands - you cannot paraphras
                                         self.on_assistant_stream({"type": "end"})
                                     except Exception:
                                         pass
-                                self.conversation_history.append({
+                                self._append_history({
                                     "role": "assistant",
                                     "content": content
                                 })
@@ -945,17 +1218,323 @@ The robot only understands these exact canonical commands - you cannot paraphras
             _log_info(f"[GPT] ERR -> {e}")
             return error_msg
     
-    def _parse_gpt_response(self, response_text: str) -> Dict:
-        """Parse GPT-OSS response"""
+    def _dispatch_tool_calls(self, tool_calls: List[Dict[str, Any]], content: str):
+        """Run one burst of tool calls from the model and record it in the history.
+        Robot steps are gated on plan review; the model sees all results on its next step.
+        """
+        tool_results = []
+        reviewed = False
+        previous = None  # (name, encoded args) and result of the last idempotent call
+        available = self.available_functions
+        for tool_call in tool_calls:
+            function = tool_call["function"]
+            function_name = function["name"]
+            function_args = function.get("arguments", {})
+            # concise argument preview for key tools
+            preview = ""
+            if function_name == "execute_robot_command" and type(function_args) is dict:
+                preview = function_args.get("language_instruction", "")[:60]
+            _log_info(f"  ↳ {function_name} {('('+preview+'...)') if preview else ''}")
+            fn = available.get(function_name)
+            if fn is not None:
+                try:
+                    function_args = _coerce_args(function_args)
+                    call_key = (function_name, _json_bytes(function_args, sort_keys=True)) if function_name in IDEMPOTENT_TOOLS else None
+                    if call_key is not None and previous is not None and previous[0] == call_key:
+                        tool_results.append(previous[1])
+                        _log_info(f"  = {function_name} (repeat, reused result)")
+                        continue
+                    previous = None
+                    # Robot steps in the same burst as the review wait for the model's next turn
+                    if function_name == "execute_robot_command" and reviewed:
+                        tool_results.append({"status": "skipped", "reason": "Plan was just reviewed; call execute_robot_command again"})
+                        _log_info(f"  - {function_name} skipped (plan just reviewed)")
+                        continue
+                    # Enforce review before executing robot steps and send plan message
+                    if function_name == "execute_robot_command" and not self.plan_approved:
+                        _log_info("[Guard] Plan not approved yet; invoking review_plan before execution")
+                        reviewed = True
+                        review_payload = self.review_plan()
+                        if self.on_tool_result:
+                            try:
+                                self.on_tool_result("review_plan", review_payload)
+                            except Exception:
+                                pass
+                        tool_results.append({"status": "skipped", "reason": "Plan was just reviewed; call execute_robot_command again"})
+                        # Record synthetic tool call/result after this burst to let model observe
+                        self._pending_history[:0] = [{
+                            "role": "assistant",
+                            "content": "",
+                            "tool_calls": [{"type": "function", "function": {"name": "review_plan", "arguments": {}}}]
+                        }, {
+                            "role": "tool",
+                            "tool_call_id": "call_review_autoguard",
+                            "name": "review_plan",
+                            "content": _json_dumps(review_payload)
+                        }]
+                        _log_info("  ✓ review_plan (auto)")
+
+                        # Plan message and execution setup is queued by review_plan
+                        continue
+                    result_payload = fn(**function_args)
+                    if self.on_tool_result:
+                        try:
+                            self.on_tool_result(function_name, result_payload)
+                        except Exception:
+                            pass
+                    tool_results.append(result_payload)
+                    _log_info(f"  ✓ {function_name}")
+                    if call_key is not None:
+                        previous = (call_key, result_payload)
+                except Exception as e:
+                    previous = None
+                    error_result = {"status": "error", "error": str(e)}
+                    tool_results.append(error_result)
+                    _log_info(f"  ✗ {function_name} -> {e}")
+            else:
+                unknown_result = {"status": "error", "error": f"Unknown function: {function_name}"}
+                tool_results.append(unknown_result)
+                _log_info(f"  ✗ Unknown function: {function_name}")
+        # Record the assistant message together with its tool results
+        self._append_history({
+            "role": "assistant",
+            "content": content,
+            "tool_calls": tool_calls
+        }, *({
+            "role": "tool",
+            "tool_call_id": f"call_{i}",
+            "name": tool_call["function"]["name"],
+            "content": _json_dumps(result_payload)
+        } for i, (tool_call, result_payload) in enumerate(zip(tool_calls, tool_results))))
+
+    def _remember_plan(self):
+        """Store a fully executed plan of canonical commands under the request that produced it"""
+        key = self._plan_cache_key
+        titles = [t.get("title") for t in self.task_list]
+        if not key or not all(title in CANONICAL_COMMANDS for title in titles):
+            return
+        self._plan_cache_key = None
+        if self._plan_cache.get(key) == titles:
+            return
+        self._plan_cache[key] = titles
+        _append_json_cache(PLAN_CACHE_PATH, key, titles)
+        _log_info(f"[Plan] Cached plan for reuse ({len(titles)} steps)")
+
+    def _cached_reply(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored reply message for an identical request (see _response_cache_key), if any"""
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        message = self._response_cache.get(key)
+        if message is not None:
+            _log_info("[Cache] Reusing stored model reply")
+        return message
+
+    def _store_reply(self, key: str, message: Dict[str, Any]):
+        """Remember a model reply (appended to the cache file), evicting the oldest entries past the limit"""
+        if not RESPONSE_CACHE_ENABLED or not (message.get("content") or message.get("tool_calls")):
+            return
+        self._response_cache[key] = message
+        while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            del self._response_cache[next(iter(self._response_cache))]
+        _append_json_cache(RESPONSE_CACHE_PATH, key, message)
+
+    def _append_history(self, *messages: Dict[str, Any]):
+        """Append to the history copy-on-write: the list is rebound, never mutated, so a reader
+        (e.g. a request being encoded) always holds a complete, stable snapshot.
+        """
+        self.conversation_history = self.conversation_history + list(messages)
+
+    def _encode_messages(self, messages: List[Dict[str, Any]]) -> bytes:
+        """Encode messages as a JSON array, reusing the bytes of messages encoded on earlier steps.
+        History messages are never modified after being appended, so their encoding is stable.
+        """
+        cache: Dict[int, Any] = {}
+        parts = []
+        for m in messages:
+            entry = self._message_bytes.get(id(m))
+            # The message itself is kept with its bytes, so a recycled id() cannot match
+            if entry is None or entry[0] is not m:
+                entry = (m, _json_bytes(m))
+            cache[id(m)] = entry
+            parts.append(entry[1])
+        self._message_bytes = cache
+        return b"[" + b",".join(parts) + b"]"
+
+    def _prune_history(self):
+        """Bound the prompt size: keep the system prompt, the current user request and the most
+        recent messages; replace everything older with a single summary note.
+        """
+        history = self.conversation_history
+        sizes = [len(m.get("content") or "") for m in history]
+        chars = sum(sizes) - sizes[0]
+        if len(history) <= HISTORY_MAX_MESSAGES and chars <= max(HISTORY_MAX_CHARS, self._pruned_chars * 3 // 2):
+            return
+        cut = max(1, len(history) - HISTORY_KEEP_RECENT)
+        tail_chars = sum(sizes[cut:])
+        while cut < len(history) - HISTORY_KEEP_RECENT // 2 and tail_chars > HISTORY_MAX_CHARS // 2:
+            tail_chars -= sizes[cut]
+            cut += 1
+        # Never split a tool-call burst: move back to the assistant message that requested these results
+        while 1 < cut < len(history) and history[cut].get("role") == "tool":
+            cut -= 1
+        last_user = max((i for i, m in enumerate(history) if m.get("role") == "user"), default=0)
+        pinned = [history[last_user]] if 0 < last_user < cut else []
+        evicted = [m for i, m in enumerate(history[1:cut], start=1) if i != last_user]
+        # Nothing new to fold when only the previous summary would go (it is re-summarized otherwise)
+        if all((m.get("content") or "").startswith(_HISTORY_SUMMARY_PREFIX) for m in evicted):
+            self._pruned_chars = chars
+            return
+        summary = self._summarize_messages(evicted)
+        self.conversation_history = (
+            [history[0], {"role": "system", "content": _HISTORY_SUMMARY_PREFIX + summary}]
+            + pinned
+            + history[cut:]
+        )
+        self._pruned_chars = sum(len(m.get("content") or "") for m in self.conversation_history[1:])
+        _log_info(f"[History] Folded {len(evicted)} messages into a summary")
+
+    def _summarize_messages(self, messages: List[Dict[str, Any]]) -> str:
+        """Ask the model for a short summary of old messages; fall back to the user requests alone"""
+        lines = []
+        for m in messages:
+            text = (m.get("content") or "")[:300]
+            calls = ", ".join(tc.get("function", {}).get("name", "") for tc in m.get("tool_calls") or [])
+            if calls:
+                text = f"{text} [called: {calls}]".strip()
+            lines.append(f"{m.get('role')}: {text}")
+        payload = {
+            "model": "gpt-oss:20b",
+            "messages": [
+                {"role": "system", "content": "Summarize this kitchen robot conversation in a few sentences: what the user asked for, which robot commands ran, and how the kitchen state changed."},
+                {"role": "user", "content": "\n".join(lines)}
+            ],
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE
+        }
+        try:
+            resp = SESSION.post(self.gpt_oss_url, data=_json_bytes(payload), timeout=60)
+            if resp.status_code == 200:
+                summary = self._parse_gpt_response(resp.content).get("message", {}).get("content", "").strip()
+                if summary:
+                    return summary
+            else:
+                _log_info(f"[History] Summary HTTP {resp.status_code}")
+        except Exception as e:
+            _log_info(f"[History] Summary ERR -> {e}")
+        user_requests = "; ".join(m["content"] for m in messages if m.get("role") == "user" and m.get("content"))
+        return f"Earlier user requests: {user_requests}" if user_requests else "Earlier messages omitted."
+
+    def _read_stream(self, response) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Read an Ollama NDJSON chat stream, forwarding content deltas to on_assistant_stream.
+        Returns the assembled assistant message (content plus any tool calls) and the stream's done_reason,
+        which is None when the stream broke off (error chunk or connection closed) before its final chunk.
+        """
+        parts: List[str] = []  # Deltas are joined once at the end, not concatenated per token
+        tool_calls: List[Dict[str, Any]] = []
+        done_reason = None
+        started = False
+        sent = 0  # parts[sent:] have not reached the UI yet
+        last_flush = 0.0
         try:
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
+            for line in _iter_ndjson(response):
+                try:
+                    chunk = _json_loads(line)
+                except ValueError:
+                    continue
+                if chunk.get("error"):
+                    # Mid-stream failure: the partial reply is returned without a done_reason
+                    _log_info(f"[Stream] ERR -> {chunk['error']}")
+                    break
+                message = chunk.get("message") or {}
+                delta = message.get("content") or ""
+                if delta:
+                    parts.append(delta)
+                if message.get("tool_calls"):
+                    tool_calls.extend(message["tool_calls"])
+                if chunk.get("done"):
+                    done_reason = chunk.get("done_reason") or "stop"
+                # Checked on every chunk, so text held back is not stuck behind thinking or tool-call chunks
+                if self.on_assistant_stream and sent < len(parts):
+                    now = time.monotonic()
+                    if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                        last_flush = now
+                        try:
+                            if not started:
+                                self.on_assistant_stream({"type": "start"})
+                                started = True
+                            self.on_assistant_stream({"type": "delta", "text": "".join(parts[sent:])})
+                        except Exception:
+                            pass
+                        sent = len(parts)
+        finally:
+            response.close()
+            if self.on_assistant_stream and sent < len(parts):
+                try:
+                    if not started:
+                        self.on_assistant_stream({"type": "start"})
+                        started = True
+                    self.on_assistant_stream({"type": "delta", "text": "".join(parts[sent:])})
+                except Exception:
+                    pass
+            if started:
+                try:
+                    self.on_assistant_stream({"type": "end"})
+                except Exception:
+                    pass
+        reply: Dict[str, Any] = {"role": "assistant", "content": "".join(parts)}
+        if tool_calls:
+            reply["tool_calls"] = tool_calls
+        return reply, done_reason
+
+    def _parse_gpt_response(self, response_bytes: bytes) -> Dict:
+        """Parse a non-streaming GPT-OSS response straight from the body bytes (no text decode)"""
+        try:
+            return _json_loads(response_bytes)
+        except ValueError as e:  # also covers UnicodeDecodeError from json.loads on invalid UTF-8
             print(f"❌ JSON decode error: {e}")
-            return {"message": {"content": response_text}}
+            return {"message": {"content": response_bytes.decode("utf-8", "replace")}}
 
 # --------------------------
 # PyQt5 UI
 # --------------------------
+def _drain(q: "deque") -> List[Any]:
+    """Take everything currently in q; items appended meanwhile stay for the next drain"""
+    items = []
+    popleft = q.popleft
+    try:
+        for _ in range(len(q)):
+            items.append(popleft())
+    except IndexError:
+        pass
+    return items
+
+# Paragraphs kept in the chat view; the oldest are dropped so inserts do not slow down as it grows
+CHAT_MAX_BLOCKS = 2000
+
+# Streamed text cleanup: CRLF -> LF, and runs of 3+ line breaks -> one blank line
+_NL_RUN_RE = re.compile(r"\n{3,}")
+
+# Chat text is inserted as HTML: escape it in one pass
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# Chat line templates (%s = escaped text): blue person emoji for the user, robot emoji for the assistant
+_USER_LINE = "<span class='user'><b><span class='emoji'>👤</span> You:</b> %s</span>"
+# Opening of an assistant line; streamed replies insert their text after it as it arrives
+_ASSISTANT_PREFIX_HTML = "<span class='assistant'><b><span class='emoji'>🤖</span> Assistant:</b> "
+_ASSISTANT_LINE = _ASSISTANT_PREFIX_HTML + "%s</span>"
+# Fixed progress lines are pre-rendered smaller and italic (no bold), colored by their class:
+# transparent thinking, green executing, orange reviewing, green approved, red rejected
+_STATUS_LINES = {
+    text: f"<span class='assistant {css}'><small><em>{text}</em></small></span>"
+    for text, css in (
+        ("🤔 Assistant is thinking...", "thinking"),
+        ("🚀 Assistant is executing...", "executing"),
+        ("📋 Assistant is reviewing...", "reviewing"),
+        ("✅ Plan approved", "approved"),
+        ("❌ Plan rejected", "rejected"),
+    )
+}
+
 class KitchenAssistantUI(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -1006,6 +1585,17 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
             .assistant.rejected small { font-size: 0.85em; } /* smaller rejected text */
             """
         )
+        # Read-only transcript: no undo stack growing with every insert
+        self.chat_history.setUndoRedoEnabled(False)
+        self.chat_history.document().setMaximumBlockCount(CHAT_MAX_BLOCKS)
+        # One cursor kept at the end of the document for every insert
+        self._chat_cursor = self.chat_history.textCursor()
+        # Streamed text waiting to be inserted in one piece at the end of a queue drain
+        self._stream_pending: List[str] = []
+        # Start of the reply being streamed (None until it shows text), for retracting it
+        self._stream_anchor: Optional[QtGui.QTextCursor] = None
+        # Streamed-line prefix parsed once (with the chat stylesheet) and inserted as a fragment
+        self._assistant_prefix = QtGui.QTextDocumentFragment.fromHtml(_ASSISTANT_PREFIX_HTML, self.chat_history.document())
         chat_layout.addWidget(self.chat_history, 1)
         
         input_row = QtWidgets.QHBoxLayout()
@@ -1106,8 +1696,10 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
         # Activity Log
         activity_group = QtWidgets.QGroupBox("Activity Log")
         activity_layout = QtWidgets.QVBoxLayout(activity_group)
-        self.activity_log = QtWidgets.QTextEdit()
+        # Plain-text, line-based widget: appends stay cheap as the log grows
+        self.activity_log = QtWidgets.QPlainTextEdit()
         self.activity_log.setReadOnly(True)
+        self.activity_log.setMaximumBlockCount(ACTIVITY_LOG_MAX_LINES)
         activity_layout.addWidget(self.activity_log)
         status_layout.addWidget(activity_group, 1)
         
@@ -1115,13 +1707,17 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
         splitter.addWidget(right_widget)
         splitter.setSizes([500, 600])
         
-        # Queues for thread-safe updates
-        self.message_queue: "queue.Queue[str]" = queue.Queue()
-        self.status_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
-        self.plan_queue: "queue.Queue[List[Dict[str, Any]]]" = queue.Queue()
-        self.exec_queue: "queue.Queue[str]" = queue.Queue()
-        self.stream_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
-        self.log_queue: "queue.Queue[str]" = queue.Queue()
+        # Queues for thread-safe updates: one producer (the chat worker) and one consumer (the UI thread),
+        # so plain deques suffice - append and popleft are atomic
+        self.message_queue: "deque[str]" = deque()
+        self.status_queue: "deque[Dict[str, Any]]" = deque()
+        self.plan_queue: "deque[List[Dict[str, Any]]]" = deque()
+        self.exec_queue: "deque[str]" = deque()
+        self.stream_queue: "deque[Dict[str, Any]]" = deque()
+        # Lines beyond what the log widget keeps would be dropped there anyway
+        self.log_queue: "deque[str]" = deque(maxlen=ACTIVITY_LOG_MAX_LINES)
+        # (title, done) pairs of the plan currently shown in the checklist
+        self._plan_signature = None
         
         # Instantiate bot with callbacks
         self.bot = GPTOSSChatBot(
@@ -1136,10 +1732,15 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
         # Initial kitchen state
         self._update_kitchen_state_display(self.bot.kitchen_state)
         
-        # Timer to poll queues
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self._poll_queues)
-        self.timer.start(100)
+        # One long-lived worker runs chat turns in the order they were sent (the bot is not
+        # re-entrant); daemon, so closing the window never waits on a model call in flight
+        self.chat_jobs: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(target=self._chat_worker, name="bot-chat", daemon=True).start()
+        
+        # Queues are drained on demand: the first put after a drain posts one queued call to
+        # _poll_queues on the GUI thread (no idle polling; later puts ride along until it runs)
+        self._wake_pending = False
+        self._wake_lock = threading.Lock()
 
         # Dark theme stylesheet for the entire UI
         self.setStyleSheet(
@@ -1147,9 +1748,9 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
             QWidget { background-color: #121212; color: #E5E7EB; }
             QGroupBox { border: 1px solid #2A2A2A; border-radius: 6px; margin-top: 12px; }
             QGroupBox::title { subcontrol-origin: margin; left: 8px; padding: 0 4px; color: #E5E7EB; font-weight: 700; font-size: 14px; }
-            QTextEdit, QLineEdit { background-color: #1E1E1E; color: #E5E7EB; border: 1px solid #2A2A2A; border-radius: 6px; }
+            QTextEdit, QPlainTextEdit, QLineEdit { background-color: #1E1E1E; color: #E5E7EB; border: 1px solid #2A2A2A; border-radius: 6px; }
             /* Larger, emoji-capable font for chat */
-            QTextEdit { font-size: 15px; font-family: 'Inter','Segoe UI','Noto Sans','DejaVu Sans','Noto Color Emoji','Apple Color Emoji','Segoe UI Emoji',sans-serif; }
+            QTextEdit, QPlainTextEdit { font-size: 15px; font-family: 'Inter','Segoe UI','Noto Sans','DejaVu Sans','Noto Color Emoji','Apple Color Emoji','Segoe UI Emoji',sans-serif; }
             QLineEdit { font-size: 14px; font-family: 'Inter','Segoe UI','Noto Sans','DejaVu Sans',sans-serif; }
             /* User task label styling */
             QLabel#userTaskLabel { color: #93C5FD; font-weight: 500; }
@@ -1171,7 +1772,7 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
 
         # Connect activity log sink
         global ACTIVITY_LOG_HOOK
-        ACTIVITY_LOG_HOOK = lambda m: self.log_queue.put(m)
+        ACTIVITY_LOG_HOOK = self._on_log
         
     def _fmt_bool(self, v: Any) -> str:
         if isinstance(v, bool):
@@ -1187,35 +1788,25 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
     
     def append_chat(self, text: str, who: str):
         if who == "user":
-            # Blue person emoji for user
-            self.chat_history.append(f"<span class='user'><b><span class='emoji'>👤</span> You:</b> {self._escape_html(text)}</span>")
+            html = _USER_LINE % self._escape_html(text)
         else:
-            # Robot emoji for assistant - check if it's a thinking or executing message
-            if text == "🤔 Assistant is thinking...":
-                # Smaller, transparent thinking message (no bold, italic)
-                self.chat_history.append(f"<span class='assistant thinking'><small><em>{self._escape_html(text)}</em></small></span>")
-            elif text == "🚀 Assistant is executing...":
-                # Smaller, green executing message (no bold, italic)
-                self.chat_history.append(f"<span class='assistant executing'><small><em>{self._escape_html(text)}</em></small></span>")
-            elif text == "📋 Assistant is reviewing...":
-                # Smaller, orange reviewing message (no bold, italic)
-                self.chat_history.append(f"<span class='assistant reviewing'><small><em>{self._escape_html(text)}</em></small></span>")
-            elif text == "✅ Plan approved":
-                # Smaller, green approved message (no bold, italic)
-                self.chat_history.append(f"<span class='assistant approved'><small><em>{self._escape_html(text)}</em></small></span>")
-            elif text == "❌ Plan rejected":
-                # Smaller, red rejected message (no bold, italic)
-                self.chat_history.append(f"<span class='assistant rejected'><small><em>{self._escape_html(text)}</em></small></span>")
-            else:
-                # Regular assistant message
-                self.chat_history.append(f"<span class='assistant'><b><span class='emoji'>🤖</span> Assistant:</b> {self._escape_html(text)}</span>")
+            html = _STATUS_LINES.get(text) or _ASSISTANT_LINE % self._escape_html(text)
+        self._chat_append_html(html)
+    
+    def _chat_append_html(self, html: str):
+        """Add html as a new paragraph at the end of the chat (like QTextEdit.append)"""
+        cursor = self._chat_cursor
+        cursor.movePosition(cursor.End)
+        if not self.chat_history.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertHtml(html)
+    
+    def _scroll_chat_to_end(self):
+        bar = self.chat_history.verticalScrollBar()
+        bar.setValue(bar.maximum())
     
     def _escape_html(self, s: str) -> str:
-        return (s
-            .replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-        )
+        return s.translate(_HTML_ESCAPE_TABLE)
     
     def render_plan(self, tasks: List[Dict[str, Any]]):
         self.task_tree.clear()
@@ -1227,6 +1818,7 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
     
     def clear_checklist(self):
         self.task_tree.clear()
+        self._plan_signature = None
     
     # Removed robot status refresh; no longer needed
     
@@ -1236,21 +1828,39 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
             return
         self.user_input.clear()
         self.append_chat(text, who="user")
+        self._scroll_chat_to_end()
         self.current_user_task_label.setText(text)
         self.current_executing_label.setText("-")
-        
-        def worker():
-            reply = self.bot.chat(text)
-            _ = reply
-        threading.Thread(target=worker, daemon=True).start()
+        self.chat_jobs.put(text)
+    
+    def _chat_worker(self):
+        while True:
+            text = self.chat_jobs.get()
+            try:
+                self.bot.chat(text)
+            except Exception as e:
+                _log_info(f"[UI] ERR chat -> {e}")
     
     # Bot callback handlers (thread-safe: push to queues)
+    def _wake_ui(self):
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        QtCore.QMetaObject.invokeMethod(self, "_poll_queues", QtCore.Qt.ConnectionType.QueuedConnection)
+    
+    def _on_log(self, message: str):
+        self.log_queue.append(message)
+        self._wake_ui()
+    
     def _on_assistant_message(self, message: str):
-        self.message_queue.put(message)
+        self.message_queue.append(message)
+        self._wake_ui()
     
     def _on_assistant_stream(self, evt: Dict[str, Any]):
-        # evt: {type: 'start'|'delta'|'end', text?: str}
-        self.stream_queue.put(evt)
+        # evt: {type: 'start'|'delta'|'end'|'discard', text?: str}
+        self.stream_queue.append(evt)
+        self._wake_ui()
     
     def _on_tool_result(self, name: str, payload: Dict[str, Any]):
         if name == "execute_robot_command":
@@ -1268,134 +1878,161 @@ class KitchenAssistantUI(QtWidgets.QMainWindow):
             pass
     
     def _on_status_update(self, payload: Dict[str, Any]):
-        self.status_queue.put(payload)
+        self.status_queue.append(payload)
+        self._wake_ui()
         if isinstance(payload, dict) and payload.get("status") == "success" and payload.get("kitchen_state") is not None:
             self._update_kitchen_state_display(payload.get("kitchen_state", {}))
     
     def _on_plan_update(self, plan: List[Dict[str, Any]]):
-        self.plan_queue.put(plan)
+        self.plan_queue.append(plan)
+        self._wake_ui()
     
     def _on_execute_start(self, instruction: str):
-        self.exec_queue.put(instruction)
+        self.exec_queue.append(instruction)
+        self._wake_ui()
     
+    @QtCore.pyqtSlot()
     def _poll_queues(self):
-        # Messages
+        # Queue items come only from the _on_* callbacks above, so their types are not re-checked here
+        # Re-arm first: anything queued while draining schedules another pass
+        with self._wake_lock:
+            self._wake_pending = False
+        # Chat edits of this pass form one edit block: the document re-lays out and signals once
+        cursor = self._chat_cursor
+        cursor.beginEditBlock()
         try:
-            while True:
-                msg = self.message_queue.get_nowait()
-                if isinstance(msg, str):
-                    self.append_chat(msg, who="assistant")
-        except queue.Empty:
-            pass
+            # Messages
+            messages = _drain(self.message_queue)
+            for msg in messages:
+                self.append_chat(msg, who="assistant")
         
-        # Streaming assistant chunks
-        try:
-            while True:
-                evt = self.stream_queue.get_nowait()
-                if not isinstance(evt, dict):
-                    continue
-                etype = evt.get("type")
+            # Streaming assistant chunks
+            events = _drain(self.stream_queue)
+            for evt in events:
+                etype = evt["type"]
                 if etype == "start":
                     self._streaming_begin()
                 elif etype == "delta":
-                    self._streaming_append(evt.get("text", ""))
+                    self._streaming_append(evt["text"])
                 elif etype == "end":
                     self._streaming_end()
-        except queue.Empty:
-            pass
+                elif etype == "discard":
+                    self._streaming_discard()
+            self._flush_stream()
+        finally:
+            cursor.endEditBlock()
+        # Scroll once for everything added to the chat in this pass
+        if messages or events:
+            self._scroll_chat_to_end()
         
         # Robot status removed
         
-        # Plan updates
-        try:
-            while True:
-                plan = self.plan_queue.get_nowait()
-                if isinstance(plan, list):
-                    self.render_plan(plan)
-                    next_task = next((t for t in plan if not t.get("done")), None)
-                    self.current_task_label.setText(next_task["title"] if next_task else "All tasks complete")
-        except queue.Empty:
-            pass
+        # Plan updates: only the latest one is shown, and only if it differs from what is on screen
+        plans = _drain(self.plan_queue)
+        if plans:
+            plan = plans[-1]
+            signature = tuple((t.get("title", ""), bool(t.get("done"))) for t in plan)
+            if signature != self._plan_signature:
+                self._plan_signature = signature
+                self.render_plan(plan)
+                next_task = next((t for t in plan if not t.get("done")), None)
+                self.current_task_label.setText(next_task["title"] if next_task else "All tasks complete")
         
-        # Executing updates
-        try:
-            while True:
-                instr = self.exec_queue.get_nowait()
-                self.current_executing_label.setText(instr)
-        except queue.Empty:
-            pass
+        # Executing updates: only the most recent instruction is visible
+        instructions = _drain(self.exec_queue)
+        if instructions:
+            self.current_executing_label.setText(instructions[-1])
         
-        # Activity log updates
-        try:
-            while True:
-                log = self.log_queue.get_nowait()
-                if isinstance(log, str):
-                    self.activity_log.append(log)
-                    self.activity_log.ensureCursorVisible()
-        except queue.Empty:
-            pass
+        # Activity log updates: one insert and one scroll for the whole batch
+        logs = _drain(self.log_queue)
+        if logs:
+            self.activity_log.appendPlainText("\n".join(logs))
+            self.activity_log.ensureCursorVisible()
 
         # Kitchen state updates (via status_queue)
-        try:
-            while True:
-                status_payload = self.status_queue.get_nowait()
-                if isinstance(status_payload, dict):
-                    ks = status_payload.get("kitchen_state")
-                    if isinstance(ks, dict):
-                        self._update_kitchen_state_display(ks)
-        except queue.Empty:
-            pass
+        for status_payload in _drain(self.status_queue):
+            ks = status_payload.get("kitchen_state")
+            if ks is not None:
+                self._update_kitchen_state_display(ks)
 
     def _streaming_begin(self):
         # Only mark stream open; defer inserting prefix until first delta arrives
         self._stream_open = True
         self._stream_started = False
+        self._stream_anchor = None
+        self._streaming_append = self._streaming_append_first
 
-    def _streaming_append(self, text: str):
+    def _streaming_append_first(self, text: str):
+        """First visible delta of a reply: trim it, open the assistant line, then switch to the steady path"""
+        # Sanitize chunk: on first chunk, strip leading whitespace/newlines
+        text = text.lstrip()
         if not text:
             return
-        # Sanitize chunk: on first chunk, strip leading whitespace/newlines
-        if not self._stream_started:
-            text = text.lstrip()
-            if not text:
-                return
-        # Collapse excessive blank lines to avoid large gaps
+        # Ensure assistant starts on a new line and insert prefix once
+        cursor = self._chat_cursor
+        cursor.movePosition(cursor.End)
+        # Remember where the reply starts so a retracted reply can be removed; stays put as text is appended
+        self._stream_anchor = QtGui.QTextCursor(cursor)
+        self._stream_anchor.setKeepPositionOnInsert(True)
+        cursor.insertBlock()
+        cursor.insertFragment(self._assistant_prefix)
+        self._stream_started = True
+        self._stream_trailing_nl = 0
+        self._streaming_append = self._streaming_append_steady
+        self._streaming_append(text)
+
+    def _streaming_append_steady(self, text: str):
+        # Spaces pass through unchanged; only line-break runs are collapsed to at most one blank line,
+        # counting the line breaks that ended the previous deltas
         text = text.replace("\r\n", "\n")
-        # If the chunk is only whitespace/newlines, limit to a single newline
-        if text.strip() == "":
-            if self._stream_last_was_blank:
-                return
-            text = "\n"
-            self._stream_last_was_blank = True
+        body = text.lstrip("\n")
+        lead = len(text) - len(body)
+        if lead:
+            lead = min(lead, 2 - min(self._stream_trailing_nl, 2))
+            text = "\n" * lead + body
+        if not body:
+            self._stream_trailing_nl += lead
         else:
-            # Reduce any 3+ consecutive newlines inside the chunk to a single blank line
-            while "\n\n\n" in text:
-                text = text.replace("\n\n\n", "\n\n")
-            self._stream_last_was_blank = False
-        cursor = self.chat_history.textCursor()
-        cursor.movePosition(cursor.End)
-        if not self._stream_started:
-            # Ensure assistant starts on a new line and insert prefix once
-            cursor.insertBlock()
-            html = "<span class='assistant'><b><span class='emoji'>🤖</span> Assistant:</b> "
-            cursor.insertHtml(html)
-            self._stream_started = True
-        cursor.insertText(text)
-        self.chat_history.setTextCursor(cursor)
-        self.chat_history.ensureCursorVisible()
+            text = _NL_RUN_RE.sub("\n\n", text)
+            self._stream_trailing_nl = len(text) - len(text.rstrip("\n"))
+        if text:
+            self._stream_pending.append(text)
+
+    # Until a stream begins, deltas take the first-delta path
+    _streaming_append = _streaming_append_first
+
+    def _flush_stream(self):
+        """Insert the streamed text collected during this drain as a single edit"""
+        if self._stream_pending:
+            cursor = self._chat_cursor
+            cursor.movePosition(cursor.End)
+            cursor.insertText("".join(self._stream_pending))
+            self._stream_pending.clear()
 
     def _streaming_end(self):
+        self._flush_stream()
         if self._stream_started:
-            cursor = self.chat_history.textCursor()
+            cursor = self._chat_cursor
             cursor.movePosition(cursor.End)
             cursor.insertHtml("</span>")
             cursor.insertBlock()
-            self.chat_history.setTextCursor(cursor)
-            self.chat_history.ensureCursorVisible()
         # Reset flags regardless
         self._stream_open = False
         self._stream_started = False
-        self._stream_last_was_blank = False
+        self._stream_trailing_nl = 0
+        self._streaming_append = self._streaming_append_first
+
+    def _streaming_discard(self):
+        """Remove the last streamed reply (the bot retracted it and will send a replacement)"""
+        self._stream_pending.clear()
+        anchor = self._stream_anchor
+        if anchor is not None:
+            # Only the cursor position is kept on insert, so re-anchor the selection there first
+            anchor.clearSelection()
+            anchor.movePosition(anchor.End, anchor.KeepAnchor)
+            anchor.removeSelectedText()
+            self._stream_anchor = None
+        self._streaming_end()
 
     def _on_robot_toggle(self, state: int):
         global ROBOT_SEND_ENABLED
@@ -1407,7 +2044,11 @@ def main():
     app = QtWidgets.QApplication([])
     window = KitchenAssistantUI()
     window.show()
-    app.exec()
+    try:
+        app.exec()
+    finally:
+        # Release the pooled keep-alive connections to Ollama
+        SESSION.close()
 
 if __name__ == "__main__":
     main()